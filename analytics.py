@@ -14,23 +14,22 @@ class CryptoAnalytics:
     # -- public analysis methods ---------------------------------------------
 
     async def market_overview(self) -> dict:
-        global_data, fng, protocols, chains = await _gather(
+        global_data, fng, protocols, (_, total_tvl) = await _gather(
             self._ds.get_global_market(),
             self._ds.get_fear_greed(),
             self._ds.get_protocols(),
-            self._ds.get_chain_tvls(),
+            self._ds.get_chain_tvls_with_total(),
         )
 
         gd = global_data.get("data", {})
         total_mcap = gd.get("total_market_cap", {}).get("usd", 0)
         total_vol = gd.get("total_volume", {}).get("usd", 0)
         mcap_change_24h = gd.get("market_cap_change_percentage_24h_usd", 0)
-        btc_dom = gd.get("market_cap_percentage", {}).get("btc", 0)
-        eth_dom = gd.get("market_cap_percentage", {}).get("eth", 0)
+        dominance = gd.get("market_cap_percentage") or {}
+        btc_dom = dominance.get("btc", 0)
+        eth_dom = dominance.get("eth", 0)
         active_coins = gd.get("active_cryptocurrencies", 0)
 
-        total_tvl = sum(c.get("tvl", 0) for c in chains) if chains else 0
-
         # Unique: mcap-to-TVL ratio
         mcap_tvl_ratio = round(total_mcap / total_tvl, 2) if total_tvl else None
 
@@ -77,17 +76,14 @@ class CryptoAnalytics:
         # Try to find DeFi TVL
         defi_tvl = None
         try:
-            protocols = await self._ds.get_protocols()
-            slug = coin.get("id", "").lower()
-            name_lower = coin.get("name", "").lower()
-            symbol_lower = coin.get("symbol", "").lower()
-            for p in protocols:
-                p_slug = p.get("slug", "").lower()
-                p_name = p.get("name", "").lower()
-                p_symbol = p.get("symbol", "").lower()
-                if p_slug == slug or p_name == name_lower or p_symbol == symbol_lower:
-                    defi_tvl = p.get("tvl")
-                    break
+            index = await self._ds.get_protocols_index()
+            match = (
+                index["by_slug"].get(coin.get("id", "").lower())
+                or index["by_symbol"].get(coin.get("symbol", "").lower())
+                or index["by_name"].get(coin.get("name", "").lower())
+            )
+            if match is not None:
+                defi_tvl = match.get("tvl")
         except Exception:
             pass
 
@@ -141,27 +137,22 @@ class CryptoAnalytics:
         }
 
     async def protocol_comparison(self, slugs: list[str]) -> dict:
-        # Get protocols list for change data
-        try:
-            all_protocols = await self._ds.get_protocols()
-            proto_by_slug = {p.get("slug", "").lower(): p for p in all_protocols}
-        except Exception:
-            proto_by_slug = {}
+        slugs = slugs[:10]
+        # Protocols list (for change data) and every detail fetch run concurrently
+        index, *details = await _gather(
+            self._ds.get_protocols_index(),
+            *(self._ds.get_protocol_detail(slug) for slug in slugs),
+            return_exceptions=True,
+        )
+        proto_by_slug = {} if isinstance(index, BaseException) else index["by_slug"]
 
         results = []
-        for slug in slugs[:10]:
+        for slug, p in zip(slugs, details):
             try:
-                p = await self._ds.get_protocol_detail(slug)
+                if isinstance(p, BaseException):
+                    raise p
                 # currentChainTvls has per-chain current TVL; sum for total
-                current_tvls = p.get("currentChainTvls", {})
-                total_tvl = sum(
-                    v for k, v in current_tvls.items()
-                    if isinstance(v, (int, float))
-                    and "borrowed" not in k.lower()
-                    and "staking" not in k.lower()
-                    and "pool2" not in k.lower()
-                    and "vesting" not in k.lower()
-                )
+                total_tvl = _current_tvl(p.get("currentChainTvls", {}))
                 # Get change data from protocols list
                 list_entry = proto_by_slug.get(slug.lower(), {})
                 results.append({
@@ -184,11 +175,10 @@ class CryptoAnalytics:
         return {"protocols": results, "count": len(results)}
 
     async def chain_tvl_ranking(self) -> dict:
-        chains = await self._ds.get_chain_tvls()
+        chains, total_tvl = await self._ds.get_chain_tvls_with_total()
 
-        ranked = sorted(chains, key=lambda c: c.get("tvl", 0), reverse=True)
         top = []
-        for c in ranked[:20]:
+        for c in heapq.nlargest(20, chains, key=lambda c: c.get("tvl") or 0):
             top.append({
                 "name": c.get("name"),
                 "tvl": c.get("tvl"),
@@ -196,7 +186,7 @@ class CryptoAnalytics:
                 "gecko_id": c.get("gecko_id"),
             })
 
-        return {"chains": top, "total_tvl": sum(c.get("tvl", 0) for c in chains)}
+        return {"chains": top, "total_tvl": total_tvl}
 
 
 # ---------------------------------------------------------------------------
@@ -204,26 +194,49 @@ class CryptoAnalytics:
 # ---------------------------------------------------------------------------
 
 import asyncio  # noqa: E402
+import heapq  # noqa: E402
+import re  # noqa: E402
 
 
-async def _gather(*coros):
-    return await asyncio.gather(*coros)
+# currentChainTvls keys that double-count TVL (e.g. "Ethereum-borrowed")
+_TVL_EXCLUDE = re.compile(r"borrowed|staking|pool2|vesting", re.IGNORECASE)
 
 
-def _sentiment_divergence(fng_value: int, price_change_pct: float) -> dict:
-    """Detect when sentiment and price action diverge.
+def _current_tvl(current_tvls: dict) -> float:
+    return sum(
+        v for k, v in current_tvls.items()
+        if isinstance(v, (int, float)) and not _TVL_EXCLUDE.search(k)
+    )
 
-    fng_value: 0-100 (0=extreme fear, 100=extreme greed)
-    price_change_pct: 24h price change percentage
-    """
+
+async def _gather(*coros, return_exceptions: bool = False):
+    return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+
+
+def _divergence_kernel(fng_value: float, price_change_pct: float) -> tuple[float, float, float]:
+    """Numeric core of the divergence score: (divergence, fng_norm, price_norm)."""
     # Normalize FNG to -1..+1 scale (50 = neutral)
     fng_norm = (fng_value - 50) / 50
 
     # Normalize price change (clamp to -10..+10 range, then to -1..+1)
-    price_norm = max(-1, min(1, price_change_pct / 10))
+    price_norm = price_change_pct / 10
+    if price_norm > 1:
+        price_norm = 1
+    elif price_norm < -1:
+        price_norm = -1
 
     # Divergence: sentiment says one thing, price does another
-    divergence = round(fng_norm - price_norm, 3)
+    return fng_norm - price_norm, fng_norm, price_norm
+
+
+def _sentiment_divergence(fng_value: int, price_change_pct: float) -> dict:
+    """Detect when sentiment and price action diverge.
+
+    fng_value: 0-100 (0=extreme fear, 100=extreme greed)
+    price_change_pct: 24h price change percentage
+    """
+    raw, fng_norm, price_norm = _divergence_kernel(fng_value, price_change_pct)
+    divergence = round(raw, 3)
 
     if divergence > 0.4:
         signal = "greedy_despite_drop"
@@ -2,11 +2,19 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import hashlib
+import math
+import os
 import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Any
 
 import httpx
+import orjson
 
 # ---------------------------------------------------------------------------
 # Cache
@@ -15,16 +23,46 @@ import httpx
 @dataclass
 class _CacheEntry:
     data: Any
-    ts: float
+    ts: float  # time.monotonic(), the clock asyncio's loop.time() uses
     ttl: float
+    derived: dict[str, Any] = field(default_factory=dict)
 
-    @property
-    def fresh(self) -> bool:
-        return (time.time() - self.ts) < self.ttl
+    def is_fresh(self, now: float) -> bool:
+        return (now - self.ts) < self.ttl
 
     @property
     def age_seconds(self) -> float:
-        return round(time.time() - self.ts, 1)
+        return round(time.monotonic() - self.ts, 1)
+
+
+class _DiskCache:
+    """JSON snapshots of slow-moving cache entries so restarts start warm."""
+
+    def __init__(self, root: str) -> None:
+        self._root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self._root / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+    def load(self, key: str) -> _CacheEntry | None:
+        try:
+            raw = orjson.loads(self._path(key).read_bytes())
+            # snapshots store wall-clock time; map it back onto the monotonic clock
+            ts = time.monotonic() - (time.time() - raw["ts"])
+            return _CacheEntry(data=raw["data"], ts=ts, ttl=raw["ttl"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, key: str, entry: _CacheEntry) -> None:
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        try:
+            self._root.mkdir(parents=True, exist_ok=True)
+            ts = time.time() - (time.monotonic() - entry.ts)
+            tmp.write_bytes(orjson.dumps({"ts": ts, "ttl": entry.ttl, "data": entry.data}))
+            tmp.replace(path)
+        except OSError:
+            pass  # best effort — the in-memory cache is authoritative
 
 
 # ---------------------------------------------------------------------------
@@ -38,6 +76,21 @@ _FEAR_GREED = "https://api.alternative.me/fng/"
 _SHORT_TTL = 300.0   # 5 min — prices, market
 _LONG_TTL = 600.0    # 10 min — protocols, trending, chains
 
+_REFRESH_LEAD = 30.0  # re-prime warm keys this long before they expire
+_REFRESH_SLEEP = (5.0, 60.0)  # min / max refresher sleep
+
+_MAX_CACHE_KEYS = 512  # bounds per-coin / per-protocol keys
+
+_CACHE_DIR = os.environ.get("CACHE_DIR", ".cache")
+
+_COIN_DETAIL_PARAMS = {
+    "localization": "false",
+    "tickers": "false",
+    "community_data": "false",
+    "developer_data": "false",
+    "sparkline": "false",
+}
+
 _HEADERS = {
     "Accept": "application/json",
     "User-Agent": "CryptoLens/2.0",
@@ -49,18 +102,42 @@ class DataSources:
 
     def __init__(self) -> None:
         self._client: httpx.AsyncClient | None = None
-        self._cache: dict[str, _CacheEntry] = {}
+        self._cache: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._disk = _DiskCache(_CACHE_DIR)
+        self._disk_writes: set[asyncio.Task] = set()
+        self._warm: dict[str, tuple[float, Any, bool]] = {}
+        self._refresher: asyncio.Task | None = None
 
     # -- lifecycle -----------------------------------------------------------
 
     async def start(self) -> None:
+        # One pooled HTTP/2 client for all upstreams: analytics fan out several
+        # concurrent GETs per request, so keep connections warm between bursts.
         self._client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=2,
+                limits=httpx.Limits(
+                    max_connections=50,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=60.0,
+                ),
+            ),
             timeout=httpx.Timeout(15.0, connect=5.0),
             headers=_HEADERS,
             follow_redirects=True,
         )
+        self._refresher = asyncio.create_task(self._refresh_loop())
 
     async def stop(self) -> None:
+        if self._refresher:
+            self._refresher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refresher
+            self._refresher = None
+        if self._disk_writes:
+            await asyncio.gather(*self._disk_writes, return_exceptions=True)
         if self._client:
             await self._client.aclose()
             self._client = None
@@ -71,26 +148,104 @@ class DataSources:
         assert self._client is not None, "call start() first"
         r = await self._client.get(url, params=params)
         r.raise_for_status()
-        return r.json()
+        return orjson.loads(r.content)
 
-    async def _cached(self, key: str, ttl: float, fetcher) -> Any:
+    async def _cached(
+        self,
+        key: str,
+        ttl: float,
+        fetcher,
+        persist: bool = False,
+        keep_warm: bool = False,
+    ) -> Any:
+        if keep_warm:
+            self._warm[key] = (ttl, fetcher, persist)
         entry = self._cache.get(key)
-        if entry and entry.fresh:
-            return entry.data
+        if entry is not None:
+            self._cache.move_to_end(key)
+            if entry.is_fresh(time.monotonic()):
+                return entry.data
         try:
-            data = await fetcher()
-            self._cache[key] = _CacheEntry(data=data, ts=time.time(), ttl=ttl)
-            return data
+            return await asyncio.shield(self._refresh(key, ttl, fetcher, persist))
         except Exception:
-            # stale-while-revalidate
+            # stale-while-revalidate; the refresh may have hydrated a stale
+            # snapshot from disk before the upstream fetch failed
+            entry = self._cache.get(key, entry)
             if entry is not None:
                 return entry.data
             raise
 
+    def _refresh(self, key: str, ttl: float, fetcher, persist: bool = False) -> asyncio.Task:
+        """Single-flight fetch: concurrent misses on *key* share one task."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._store(key, ttl, fetcher, persist))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._fetch_done(key, t))
+        return task
+
+    async def _store(self, key: str, ttl: float, fetcher, persist: bool) -> Any:
+        if persist and key not in self._cache:
+            # cold key: read the snapshot once for all coalesced waiters and
+            # only go upstream if it is missing or stale
+            entry = await asyncio.to_thread(self._disk.load, key)
+            if entry is not None:
+                self._put(key, entry)
+                if entry.is_fresh(time.monotonic()):
+                    return entry.data
+        data = await fetcher()
+        entry = _CacheEntry(data=data, ts=time.monotonic(), ttl=ttl)
+        self._put(key, entry)
+        if persist:
+            # write-through off the event loop; callers don't wait on disk
+            write = asyncio.ensure_future(asyncio.to_thread(self._disk.save, key, entry))
+            self._disk_writes.add(write)
+            write.add_done_callback(self._disk_writes.discard)
+        return data
+
+    def _put(self, key: str, entry: _CacheEntry) -> None:
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        if len(self._cache) > _MAX_CACHE_KEYS:
+            self._cache.popitem(last=False)
+
+    def _fetch_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # every waiter may have gone away
+
+    def _derive(self, key: str, data: Any, name: str, build) -> Any:
+        """Memoize ``build(data)`` on the cache entry currently holding *data*."""
+        entry = self._cache.get(key)
+        if entry is None or entry.data is not data:
+            return build(data)
+        if name not in entry.derived:
+            entry.derived[name] = build(data)
+        return entry.derived[name]
+
+    async def _refresh_loop(self) -> None:
+        """Re-fetch keep_warm keys shortly before they expire, off the request path."""
+        lo, hi = _REFRESH_SLEEP
+        while True:
+            now = time.monotonic()
+            due = []
+            sleep_for = hi
+            for key, (ttl, fetcher, persist) in self._warm.items():
+                entry = self._cache.get(key)
+                remaining = entry.ts + entry.ttl - now - _REFRESH_LEAD if entry else 0.0
+                if remaining <= 0:
+                    due.append(self._refresh(key, ttl, fetcher, persist))
+                else:
+                    sleep_for = min(sleep_for, remaining)
+            if due:
+                await asyncio.gather(*due, return_exceptions=True)
+            await asyncio.sleep(min(max(sleep_for, lo), hi))
+
     def cache_stats(self) -> dict:
-        now = time.time()
+        now = time.monotonic()
         total = len(self._cache)
-        fresh = sum(1 for e in self._cache.values() if e.fresh)
+        fresh = sum(1 for e in self._cache.values() if e.is_fresh(now))
         return {"total_keys": total, "fresh": fresh, "stale": total - fresh}
 
     # -- CoinGecko -----------------------------------------------------------
@@ -115,7 +270,7 @@ class DataSources:
     async def get_trending(self) -> dict:
         async def fetch():
             return await self._get(f"{_COINGECKO}/search/trending")
-        return await self._cached("trending", _LONG_TTL, fetch)
+        return await self._cached("trending", _LONG_TTL, fetch, keep_warm=True)
 
     async def get_global_market(self) -> dict:
         async def fetch():
@@ -124,16 +279,7 @@ class DataSources:
 
     async def get_coin_detail(self, coin_id: str) -> dict:
         async def fetch():
-            return await self._get(
-                f"{_COINGECKO}/coins/{coin_id}",
-                params={
-                    "localization": "false",
-                    "tickers": "false",
-                    "community_data": "false",
-                    "developer_data": "false",
-                    "sparkline": "false",
-                },
-            )
+            return await self._get(f"{_COINGECKO}/coins/{coin_id}", params=_COIN_DETAIL_PARAMS)
         return await self._cached(f"coin:{coin_id}", _SHORT_TTL, fetch)
 
     # -- DeFiLlama -----------------------------------------------------------
@@ -141,12 +287,26 @@ class DataSources:
     async def get_protocols(self) -> list[dict]:
         async def fetch():
             return await self._get(f"{_DEFILLAMA}/protocols")
-        return await self._cached("protocols", _LONG_TTL, fetch)
+        return await self._cached("protocols", _LONG_TTL, fetch, persist=True, keep_warm=True)
+
+    async def get_protocols_index(self) -> dict[str, dict[str, dict]]:
+        """Lowercased slug/name/symbol -> protocol lookups over ``get_protocols``.
+
+        Rebuilt only when the cached protocols list is replaced; the first
+        protocol (highest TVL) wins on duplicate keys.
+        """
+        protocols = await self.get_protocols()
+        return self._derive("protocols", protocols, "index", _index_protocols)
 
     async def get_chain_tvls(self) -> list[dict]:
         async def fetch():
             return await self._get(f"{_DEFILLAMA}/v2/chains")
-        return await self._cached("chains", _LONG_TTL, fetch)
+        return await self._cached("chains", _LONG_TTL, fetch, persist=True, keep_warm=True)
+
+    async def get_chain_tvls_with_total(self) -> tuple[list[dict], float]:
+        """``get_chain_tvls`` plus the summed TVL, computed once per refresh."""
+        chains = await self.get_chain_tvls()
+        return chains, self._derive("chains", chains, "total_tvl", _total_tvl)
 
     async def get_protocol_detail(self, slug: str) -> dict:
         async def fetch():
@@ -156,12 +316,12 @@ class DataSources:
     async def get_dex_overview(self) -> dict:
         async def fetch():
             return await self._get(f"{_DEFILLAMA}/overview/dexs")
-        return await self._cached("dex_overview", _LONG_TTL, fetch)
+        return await self._cached("dex_overview", _LONG_TTL, fetch, keep_warm=True)
 
     async def get_stablecoins(self) -> dict:
         async def fetch():
             return await self._get(f"{_DEFILLAMA}/stablecoins")
-        return await self._cached("stablecoins", _LONG_TTL, fetch)
+        return await self._cached("stablecoins", _LONG_TTL, fetch, keep_warm=True)
 
     # -- Fear & Greed --------------------------------------------------------
 
@@ -175,3 +335,25 @@ class DataSources:
                 "timestamp": entry.get("timestamp"),
             }
         return await self._cached("fng", _SHORT_TTL, fetch)
+
+
+# ---------------------------------------------------------------------------
+# Derived views
+# ---------------------------------------------------------------------------
+
+def _index_protocols(protocols: list[dict]) -> dict[str, dict[str, dict]]:
+    index: dict[str, dict[str, dict]] = {"by_slug": {}, "by_name": {}, "by_symbol": {}}
+    for p in protocols:
+        for field_name, lookup in (
+            ("slug", index["by_slug"]),
+            ("name", index["by_name"]),
+            ("symbol", index["by_symbol"]),
+        ):
+            value = (p.get(field_name) or "").lower()
+            if value:
+                lookup.setdefault(value, p)
+    return index
+
+
+def _total_tvl(chains: list[dict]) -> float:
+    return math.fsum(c.get("tvl") or 0 for c in chains)
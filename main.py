@@ -2,17 +2,31 @@
 
 from __future__ import annotations
 
+import hashlib
+import hmac
 import os
+import time
 from datetime import datetime, timezone
 from contextlib import asynccontextmanager
 
+import orjson
 from fastapi import FastAPI, Request, Query, Header
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from mcp_server import mcp, data_sources, analytics, tracker
 
 TRACKER_TOKEN = os.environ.get("TRACKER_TOKEN", "")
+_TRACKER_BEARER = f"Bearer {TRACKER_TOKEN}".encode()
+
+_ALL_SOURCES = ("coingecko", "defillama", "alternative.me")
+_COINGECKO_FNG = ("coingecko", "alternative.me")
+_DEFILLAMA_ONLY = ("defillama",)
+
+# Browsers/CDNs may reuse a response this long, then revalidate by ETag
+_CLIENT_MAX_AGE = 60
+_STATIC_MAX_AGE = 3600  # docs page and manifest only change on deploy
 
 
 # ── Lifespan ─────────────────────────────────────────────────────
@@ -33,6 +47,7 @@ app = FastAPI(
     description="Cross-source crypto analytics combining CoinGecko, DeFiLlama, and Fear & Greed Index.",
     version="2.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url=None,
     redoc_url=None,
 )
@@ -44,77 +59,142 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+class _GZipExceptMCP(GZipMiddleware):
+    """GZip REST/docs responses; MCP streams SSE, which gzip would hold back."""
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith("/mcp"):
+            await self.app(scope, receive, send)
+        else:
+            await super().__call__(scope, receive, send)
+
+
+app.add_middleware(_GZipExceptMCP, minimum_size=512)
+
 app.mount("/mcp", mcp.streamable_http_app())
 
 
 # ── Helpers ──────────────────────────────────────────────────────
 
 
-def _fp(request: Request) -> str:
+def _fp(request: Request, user_agent: str) -> str:
+    headers = request.headers
     return tracker.fingerprint(
-        user_agent=request.headers.get("user-agent", ""),
-        accept=request.headers.get("accept", ""),
-        accept_encoding=request.headers.get("accept-encoding", ""),
-        accept_language=request.headers.get("accept-language", ""),
+        user_agent=user_agent,
+        accept=headers.get("accept", ""),
+        accept_encoding=headers.get("accept-encoding", ""),
+        accept_language=headers.get("accept-language", ""),
         ip=request.client.host if request.client else "",
     )
 
 
 def _track(request: Request, endpoint: str, params: dict | None = None) -> None:
-    fp = _fp(request)
+    user_agent = request.headers.get("user-agent", "")
     tracker.log_request(
-        fingerprint=fp,
+        fingerprint=_fp(request, user_agent),
         endpoint=endpoint,
         params=params or {},
-        user_agent=request.headers.get("user-agent", ""),
+        user_agent=user_agent,
     )
 
 
-def _wrap(data: dict, sources: list[str] | None = None) -> dict:
-    return {
-        "data": data,
-        "meta": {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "data_sources": sources or ["coingecko", "defillama", "alternative.me"],
-            "cache_refresh_seconds": 300,
-        },
+_now_iso: tuple[int, str] = (0, "")
+
+
+def _utc_now_iso() -> str:
+    """Current UTC time as ISO-8601, formatted at most once per second."""
+    global _now_iso
+    sec = int(time.time())
+    if sec != _now_iso[0]:
+        _now_iso = (sec, datetime.fromtimestamp(sec, timezone.utc).isoformat())
+    return _now_iso[1]
+
+
+def _wrap(body: bytes, sources: tuple[str, ...] = _ALL_SOURCES) -> bytes:
+    """Splice already-encoded ``data`` into the ``{"data", "meta"}`` envelope."""
+    meta = {
+        "timestamp": _utc_now_iso(),
+        "data_sources": sources,
+        "cache_refresh_seconds": 300,
     }
+    return b'{"data":' + body + b',"meta":' + orjson.dumps(meta) + b"}"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: only the opaque part must agree
+    opaque = etag.removeprefix("W/")
+    return any(t.strip().removeprefix("W/") == opaque for t in if_none_match.split(","))
+
+
+def _etag(body: bytes) -> str:
+    # Weak: GZip may send the same body gzipped or identity under this tag
+    return f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def _static(request: Request, body: bytes, etag: str, media_type: str) -> Response:
+    """Serve a precomputed body with its ETag; 304 if the client already has it."""
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={_STATIC_MAX_AGE}"}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def _respond(request: Request, data: dict, sources: tuple[str, ...] = _ALL_SOURCES) -> Response:
+    """Serialize a wrapped payload with an ETag; 304 if the client already has it.
+
+    The ETag covers ``data`` only — ``meta.timestamp`` changes every call.
+    """
+    body = orjson.dumps(data)
+    etag = _etag(body)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={_CLIENT_MAX_AGE}"}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=_wrap(body, sources),
+        media_type="application/json",
+        headers=headers,
+    )
 
 
 # ── Public REST endpoints ────────────────────────────────────────
 
 
 @app.get("/", response_class=HTMLResponse)
-async def homepage():
-    return _DOCS_HTML
+async def homepage(request: Request):
+    return _static(request, _DOCS_BYTES, _DOCS_ETAG, "text/html; charset=utf-8")
 
 
 @app.get("/api/v1/market")
 async def market_overview(request: Request):
     _track(request, "/api/v1/market")
     data = await analytics.market_overview()
-    return _wrap(data)
+    return _respond(request, data)
 
 
 @app.get("/api/v1/token/{coin_id}")
 async def token_analysis(coin_id: str, request: Request):
     _track(request, "/api/v1/token", {"coin_id": coin_id})
     data = await analytics.token_analysis(coin_id)
-    return _wrap(data, ["coingecko", "defillama", "alternative.me"])
+    return _respond(request, data, _ALL_SOURCES)
 
 
 @app.get("/api/v1/trending")
 async def trending(request: Request):
     _track(request, "/api/v1/trending")
     data = await analytics.trending_with_context()
-    return _wrap(data, ["coingecko", "alternative.me"])
+    return _respond(request, data, _COINGECKO_FNG)
 
 
 @app.get("/api/v1/chains")
 async def chain_ranking(request: Request):
     _track(request, "/api/v1/chains")
     data = await analytics.chain_tvl_ranking()
-    return _wrap(data, ["defillama"])
+    return _respond(request, data, _DEFILLAMA_ONLY)
 
 
 @app.get("/api/v1/protocols/compare")
@@ -122,10 +202,11 @@ async def compare_protocols(
     request: Request,
     slugs: str = Query(..., description="Comma-separated DeFiLlama protocol slugs"),
 ):
-    slug_list = [s.strip() for s in slugs.split(",") if s.strip()]
+    # protocol_comparison only uses the first ten; don't retain more in tracked params
+    slug_list = [s for s in map(str.strip, slugs.split(",")) if s][:10]
     _track(request, "/api/v1/protocols/compare", {"slugs": slug_list})
     data = await analytics.protocol_comparison(slug_list)
-    return _wrap(data, ["defillama"])
+    return _respond(request, data, _DEFILLAMA_ONLY)
 
 
 @app.get("/api/v1/health")
@@ -138,26 +219,30 @@ async def health(request: Request):
     }
 
 
+_AGENT_MANIFEST_BYTES = orjson.dumps({
+    "name": "CryptoLens",
+    "description": "Cross-source crypto analytics API combining CoinGecko, DeFiLlama, and Fear & Greed Index.",
+    "version": "2.0.0",
+    "entry_point": "/api/v1/market",
+    "endpoints": [
+        "/api/v1/market",
+        "/api/v1/token/{coin_id}",
+        "/api/v1/trending",
+        "/api/v1/chains",
+        "/api/v1/protocols/compare?slugs=",
+        "/api/v1/health",
+    ],
+    "mcp": "/mcp",
+    "formats": ["application/json"],
+    "data_sources": ["coingecko", "defillama", "alternative.me"],
+})
+_AGENT_MANIFEST_ETAG = _etag(_AGENT_MANIFEST_BYTES)
+
+
 @app.get("/.well-known/agent.json")
 async def agent_manifest(request: Request):
     _track(request, "/.well-known/agent.json")
-    return {
-        "name": "CryptoLens",
-        "description": "Cross-source crypto analytics API combining CoinGecko, DeFiLlama, and Fear & Greed Index.",
-        "version": "2.0.0",
-        "entry_point": "/api/v1/market",
-        "endpoints": [
-            "/api/v1/market",
-            "/api/v1/token/{coin_id}",
-            "/api/v1/trending",
-            "/api/v1/chains",
-            "/api/v1/protocols/compare?slugs=",
-            "/api/v1/health",
-        ],
-        "mcp": "/mcp",
-        "formats": ["application/json"],
-        "data_sources": ["coingecko", "defillama", "alternative.me"],
-    }
+    return _static(request, _AGENT_MANIFEST_BYTES, _AGENT_MANIFEST_ETAG, "application/json")
 
 
 # ── Internal analytics (bearer token required, 404 without) ─────
@@ -166,8 +251,10 @@ async def agent_manifest(request: Request):
 def _check_token(request: Request) -> bool:
     if not TRACKER_TOKEN:
         return False
-    auth = request.headers.get("authorization", "")
-    return auth == f"Bearer {TRACKER_TOKEN}"
+    auth = request.headers.get("authorization")
+    if not auth:
+        return False
+    return hmac.compare_digest(auth.encode(), _TRACKER_BEARER)
 
 
 @app.get("/internal/analytics/summary")
@@ -294,3 +381,7 @@ Connect via <code>/mcp</code> for native tool integration. Tools: <code>market_o
 </div>
 </body>
 </html>"""
+
+# Encoded once; the page is static
+_DOCS_BYTES = _DOCS_HTML.encode()
+_DOCS_ETAG = _etag(_DOCS_BYTES)
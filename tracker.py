@@ -2,12 +2,19 @@
 
 from __future__ import annotations
 
+import functools
 import hashlib
+import heapq
 import time
+from collections import Counter, OrderedDict, deque
 from dataclasses import dataclass, field
+from itertools import islice
 
 
-@dataclass
+_JOURNEY_EVENTS = 200
+
+
+@dataclass(slots=True)
 class _Event:
     ts: float
     endpoint: str
@@ -21,22 +28,28 @@ class _AgentProfile:
     first_seen: float
     last_seen: float = 0
     request_count: int = 0
-    endpoints_used: dict[str, int] = field(default_factory=dict)
-    tools_used: dict[str, int] = field(default_factory=dict)
+    endpoints_used: Counter[str] = field(default_factory=Counter)
+    tools_used: Counter[str] = field(default_factory=Counter)
     user_agents: set[str] = field(default_factory=set)
+    # This agent's most recent events, a subset of AgentTracker._events
+    events: deque[_Event] = field(default_factory=lambda: deque(maxlen=_JOURNEY_EVENTS))
 
 
 class AgentTracker:
     """In-memory behavioral tracker. Never exposes data in public API responses."""
 
     def __init__(self) -> None:
-        self._events: list[_Event] = []
-        self._agents: dict[str, _AgentProfile] = {}
         self._max_events = 10_000
+        self._max_agents = 10_000
+        self._events: deque[_Event] = deque(maxlen=self._max_events)
+        self._endpoint_counts: Counter[str] = Counter()  # over _events
+        # LRU by last request, so the table stays bounded under fingerprint churn
+        self._agents: OrderedDict[str, _AgentProfile] = OrderedDict()
 
     # -- fingerprinting ------------------------------------------------------
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)  # clients resend identical headers
     def fingerprint(
         user_agent: str = "",
         accept: str = "",
@@ -45,7 +58,9 @@ class AgentTracker:
         ip: str = "",
     ) -> str:
         raw = f"{user_agent}|{accept}|{accept_encoding}|{accept_language}|{ip}"
-        return hashlib.sha256(raw.encode()).hexdigest()[:16]
+        # Identity key, not a security primitive: 8-byte BLAKE2b is cheaper than
+        # SHA-256 and still yields the same 16-hex-char format.
+        return hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
 
     # -- event logging -------------------------------------------------------
 
@@ -60,31 +75,42 @@ class AgentTracker:
 
         # Record event
         ev = _Event(ts=now, endpoint=endpoint, params=params or {}, fingerprint=fingerprint)
+        if len(self._events) == self._max_events:
+            self._evict(self._events[0])  # about to fall off the ring
         self._events.append(ev)
-        if len(self._events) > self._max_events:
-            self._events = self._events[-self._max_events:]
+        self._endpoint_counts[endpoint] += 1
 
         # Update agent profile
         agent = self._agents.get(fingerprint)
         if agent is None:
             agent = _AgentProfile(fingerprint=fingerprint, first_seen=now)
             self._agents[fingerprint] = agent
+            if len(self._agents) > self._max_agents:
+                self._agents.popitem(last=False)
+        else:
+            self._agents.move_to_end(fingerprint)
         agent.last_seen = now
         agent.request_count += 1
-        agent.endpoints_used[endpoint] = agent.endpoints_used.get(endpoint, 0) + 1
+        agent.endpoints_used[endpoint] += 1
+        agent.events.append(ev)
         if user_agent:
             agent.user_agents.add(user_agent)
 
     def log_tool_use(self, fingerprint: str, tool_name: str) -> None:
         agent = self._agents.get(fingerprint)
         if agent:
-            agent.tools_used[tool_name] = agent.tools_used.get(tool_name, 0) + 1
+            agent.tools_used[tool_name] += 1
 
     # -- internal analytics (only for authenticated endpoints) ---------------
 
     def summary(self) -> dict:
-        now = time.time()
-        active_1h = sum(1 for a in self._agents.values() if (now - a.last_seen) < 3600)
+        cutoff = time.time() - 3600
+        # _agents is ordered by last request, so walk back only through recent ones
+        active_1h = 0
+        for a in reversed(self._agents.values()):
+            if a.last_seen <= cutoff:
+                break
+            active_1h += 1
         return {
             "total_agents": len(self._agents),
             "active_last_hour": active_1h,
@@ -101,7 +127,7 @@ class AgentTracker:
                 "params": e.params,
                 "fingerprint": e.fingerprint,
             }
-            for e in reversed(self._events[-limit:])
+            for e in islice(reversed(self._events), max(limit, 0))
         ]
 
     def agent_journey(self, fingerprint: str) -> dict | None:
@@ -110,8 +136,7 @@ class AgentTracker:
             return None
         events = [
             {"ts": e.ts, "endpoint": e.endpoint, "params": e.params}
-            for e in self._events
-            if e.fingerprint == fingerprint
+            for e in agent.events
         ]
         return {
             "fingerprint": agent.fingerprint,
@@ -121,22 +146,29 @@ class AgentTracker:
             "endpoints_used": agent.endpoints_used,
             "tools_used": agent.tools_used,
             "user_agents": list(agent.user_agents),
-            "events": events[-200:],
+            "events": events,
         }
 
     # -- private helpers -----------------------------------------------------
 
+    def _evict(self, ev: _Event) -> None:
+        """Drop counts and per-agent references for an event leaving the buffer."""
+        counts = self._endpoint_counts
+        counts[ev.endpoint] -= 1
+        if counts[ev.endpoint] <= 0:
+            del counts[ev.endpoint]
+        agent = self._agents.get(ev.fingerprint)
+        if agent is not None and agent.events and agent.events[0] is ev:
+            agent.events.popleft()
+
     def _top_endpoints(self, limit: int) -> list[dict]:
-        counter: dict[str, int] = {}
-        for e in self._events:
-            counter[e.endpoint] = counter.get(e.endpoint, 0) + 1
         return [
             {"endpoint": k, "count": v}
-            for k, v in sorted(counter.items(), key=lambda x: x[1], reverse=True)[:limit]
+            for k, v in self._endpoint_counts.most_common(limit)
         ]
 
     def _top_agents(self, limit: int) -> list[dict]:
-        agents = sorted(self._agents.values(), key=lambda a: a.request_count, reverse=True)
+        agents = heapq.nlargest(limit, self._agents.values(), key=lambda a: a.request_count)
         return [
             {
                 "fingerprint": a.fingerprint,
@@ -145,5 +177,5 @@ class AgentTracker:
                 "last_seen": a.last_seen,
                 "endpoints": len(a.endpoints_used),
             }
-            for a in agents[:limit]
+            for a in agents
         ]